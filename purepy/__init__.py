@@ -36,23 +36,74 @@ Example:
 """
 from __future__ import absolute_import
 
-import uuid
-import types
-import inspect
+import itertools
 from purepy import util
-from functools import wraps
+
+# threading.local without the cost of importing threading
+try:
+    from _thread import _local as _thread_local
+except ImportError: # pragma: no cover (py2)
+    from thread import _local as _thread_local
+
+# Sentinel for an attribute that is not in a class __dict__
+_MISSING = object()
+
+# Atomic counter for PureVirtualMeta.new() ids
+_registry_count = itertools.count()
 
 # -- :EXPORT:
 class PureVirtualError(Exception):
     """ General Error for purepy """
     pass
 
+# -- :EXPORT:
+class PureVirtualViolation(object):
+    """
+    A single problem found with a class declaration while collecting
+    violations (see PureVirtualMeta.collect_violations)
+    """
+    MUST_OVERLOAD = 'must_overload'
+    WRONG_SIGNATURE = 'wrong_signature'
+
+    __slots__ = ('cls', 'base', 'name', 'kind', 'detail')
+
+    def __init__(self, cls, base, name, kind, detail):
+        self.cls = cls
+        self.base = base
+        self.name = name
+        self.kind = kind
+        self.detail = detail
+
+    def __repr__(self):
+        return "<PureVirtualViolation {}({}).{} {}>".format(
+            self.cls.__name__, self.base.__name__, self.name, self.kind
+        )
+
+
+class _ViolationCollector(object):
+    """
+    Context for PureVirtualMeta.collect_violations()
+    """
+    def __init__(self):
+        self.violations = []
+
+    def __enter__(self):
+        PureVirtualMeta._collector_stack().append(self.violations)
+        return self.violations
+
+    def __exit__(self, *args):
+        PureVirtualMeta._collector_stack().pop()
+
+
 # -- :EXPORT:
 class PureVirtualMeta(type):
     """
     The metaclass that handles our virtual class.
     """
     _registry = {}
+    _collector_state = _thread_local()
+    _generic_contracts = {}
+    _type_hint_cache = {}
     def __init__(cls, name, bases, dct):
         """
         Construct the class, if this is a subclass, then assert that it's either
@@ -86,6 +137,30 @@ class PureVirtualMeta(type):
                                     ))
         return inst
 
+    def __setattr__(cls, name, value):
+        """
+        When the class variable pv_guard_assignment is set, assigning to a class
+        re-validates the assigned name against the cached contract of the class and
+        its subclasses. A failed assignment is rolled back before raising.
+        """
+        if not getattr(cls, 'pv_guard_assignment', False):
+            return super(PureVirtualMeta, cls).__setattr__(name, value)
+
+        previous = cls.__dict__.get(name, _MISSING)
+        super(PureVirtualMeta, cls).__setattr__(name, value)
+        PureVirtualMeta._guard_member(cls, name, previous)
+
+    def __delattr__(cls, name):
+        """
+        Counterpart to __setattr__ for removing an overload from a guarded class
+        """
+        if not getattr(cls, 'pv_guard_assignment', False):
+            return super(PureVirtualMeta, cls).__delattr__(name)
+
+        previous = cls.__dict__.get(name, _MISSING)
+        super(PureVirtualMeta, cls).__delattr__(name)
+        PureVirtualMeta._guard_member(cls, name, previous)
+
     # -- Class Methods (Publish Interface)
 
     @classmethod
@@ -103,6 +178,7 @@ class PureVirtualMeta(type):
             details = {
                 "_pv_virtual_id" : name,
                 "_pv_strict_types" : kwargs.get("strict_types", True),
+                "_pv_type_variance" : kwargs.get("type_variance", False),
                 "_pv_strict_defaults" : kwargs.get("strict_defaults", True),
                 "_pv_force_not_impl" : kwargs.get("force_not_implemented", True),
             }
@@ -129,19 +205,35 @@ class PureVirtualMeta(type):
         Simpler call for the new_class() above - handles the registry name internally
         :return: Decorator function that can be used at a per-class level.
         """
-        def _get_uuid():
-            this_id = uuid.uuid4()
+        def _get_id():
+            this_id = '<purepy-{}>'.format(next(_registry_count))
             while this_id in cls._registry:
-                # We should never really get here.
-                this_id = uuid.uuid4() # pragma: no cover
+                # Only if someone used our naming with new_class()
+                this_id = '<purepy-{}>'.format(next(_registry_count)) # pragma: no cover
             return this_id
-        return cls.new_class(_get_uuid(), **kwargs)
+        return cls.new_class(_get_id(), **kwargs)
+
+    @classmethod
+    def collect_violations(cls):
+        """
+        Context manager that records problems with class declarations instead of
+        raising. Classes are still created, allowing a whole package to be
+        imported and checked in one pass. Only classes created on the calling
+        thread are collected.
+
+            with PureVirtualMeta.collect_violations() as violations:
+                import my_package
+
+        :return: _ViolationCollector whose context is a list[PureVirtualViolation]
+        """
+        return _ViolationCollector()
 
     @classmethod
     def pure_virtual_functions(cls, instance):
         """
         :return: list[str] of functions that are marked as pure virtual
         """
+        import inspect
         funcs = []
         for name, call in inspect.getmembers(instance, predicate=inspect.isroutine):
             if getattr(call, '_pv_is_pure_virtual', None):
@@ -167,81 +259,289 @@ class PureVirtualMeta(type):
     # -- Private Functions
 
     @classmethod
-    def _assert_subclass_viable(pv, cls, bases):
+    def _collector_stack(pv):
         """
-        Internal function that does the in line subclass verification.
-        This will raise a PureVirtualError if something is amiss
+        :return: list of the violation lists being collected into on this thread
+        """
+        stack = getattr(pv._collector_state, 'stack', None)
+        if stack is None:
+            stack = pv._collector_state.stack = []
+        return stack
+
+    @classmethod
+    def _pure_virtual_members(pv, base):
+        """
+        :return: list[tuple(str, callable)] of the pure virtual functions found on base
+        """
+        import types
+        import inspect
+        return [
+            (name, call) for name, call in inspect.getmembers(base,
+                lambda o: isinstance(o, (types.MethodType, types.FunctionType)) and not isinstance(o, property)
+            ) if getattr(call, '_pv_is_pure_virtual', None)
+        ]
+
+    @classmethod
+    def _check_overload(pv, cls, base, name, call, must_overload, wrong_signature, alias=None):
+        """
+        Check a single pure virtual function from base against what cls currently
+        resolves name to. Problems are added to the must_overload and wrong_signature
+        dictionaries, keyed by the function name.
+        :param alias: parameterized generic of base (e.g. Repository[User]) whose
+                      type parameters are substituted before comparing
         :return: None
         """
+        annotations = None
+
+        def _proper_layout():
+            layout = util.signature(call)
+            if annotations is None:
+                return layout
+            # Show what was actually compared against (e.g. generics substituted)
+            return layout.replace(
+                parameters=[
+                    p.replace(annotation=annotations.get(p.name, p.empty))
+                    for p in layout.parameters.values()
+                ],
+                return_annotation=annotations.get('return', layout.empty)
+            )
+
+        def _signature(name, wrong):
+            wrong_layout = util.signature(wrong)
+            proper_layout = _proper_layout()
+            return "def {name}{wrong_layout}: -> def {name}{proper_layout}:".format(**locals())
+
+        attr = getattr(cls, name)
+
+        # For override decorator
+        if getattr(attr, '_pv_override', False):
+            attr = attr.pv_overloaded_function
+
+        if not hasattr(attr, '__code__'):
+            # Not a function at all (e.g. Impl.save = None)
+            wrong_signature[name] = "{} = {!r} -> def {}{}:".format(
+                name, attr, call.__name__, _proper_layout()
+            )
+        elif call.__code__ is attr.__code__:
+            # Check 1: Have we overloaded all functions?
+            sig = util.signature(call)
+            must_overload[name] = "def {}{}".format(call.__name__, sig)
+        elif getattr(base, 'pv_explicit_args', True):
+            # Check 2: Do the arguments line up?
+            proper = util.getfullargspec(call)._asdict()
+            attr_sig = util.getfullargspec(attr)._asdict()
+
+            compatible = True
+            if util.PY3:
+                proper_annotations = proper.pop('annotations')
+                attr_annotations = attr_sig.pop('annotations')
+
+                if call._pv_strict_types:
+                    # Only strings need typing.get_type_hints, otherwise the raw
+                    # annotations can be compared as they are
+                    resolve = (util.has_string_annotations(proper_annotations) or
+                               util.has_string_annotations(attr_annotations))
+                    if resolve:
+                        proper_annotations = pv._pure_virtual_hints(call)
+                        attr_annotations = util.type_hints(attr) or attr_annotations
+
+                    if alias is not None:
+                        annotations = pv._generic_contract(alias, resolve).get(name)
+                        if annotations is not None:
+                            proper_annotations = annotations
+
+                    if call._pv_type_variance:
+                        compatible = util.annotations_compatible(proper_annotations, attr_annotations)
+                    else:
+                        compatible = (proper_annotations == attr_annotations)
+
+            if not call._pv_strict_defaults:
+                proper.pop('defaults')
+                attr_sig.pop('defaults')
+
+            if not compatible or proper != attr_sig:
+                wrong_signature[name] = _signature(call.__name__, attr)
+
+    @classmethod
+    def _format_violations(pv, cls, base, must_overload, wrong_signature):
+        """
+        :return: str describing everything cls got wrong about base
+        """
         def _class_file():
             return (' ' + cls.__file__) if hasattr(cls, '__file__') else ''
 
-        def _signature(name, proper, wrong):
-            wrong_layout = util.signature(wrong)
-            proper_layout = util.signature(proper)
-            return "def {name}{wrong_layout}: -> def {name}{proper_layout}:".format(**locals())
+        error_message = "Virtual Class Declaration:\n"
+
+        if must_overload:
+            error_message +=  ("- '{}'{}: The following pure virtual functions must be overloaded from base: '{}'" +\
+                               " before class can be used:\n    - {}{}").format(
+                                  cls.__name__,
+                                  _class_file(),
+                                  base.__name__,
+                                  '\n    - '.join(must_overload.values()),
+                                  '\n' if len(wrong_signature) > 0 else ''
+                              )
+        if wrong_signature:
+            error_message += ("- '{}'{}: The following overload functions have the wrong signature " +\
+                              "from base: '{}'\n    - {}").format(
+                                  cls.__name__,
+                                  _class_file(),
+                                  base.__name__,
+                                  "\n    - ".join(wrong_signature.values())
+                              )
+
+        return error_message
 
-        def _iterate(base):
-            """
-            Check each of the bases to do all assertion checks
-            """
-            must_overload = set()
-            wrong_signature = set()
+    @classmethod
+    def _report_violations(pv, cls, base, must_overload, wrong_signature):
+        """
+        Raise a PureVirtualError for any problems cls has with base or, when
+        inside collect_violations(), record them instead.
+        :return: None
+        """
+        if not must_overload and not wrong_signature:
+            return
 
-            for name, call in inspect.getmembers(base,
-                lambda o: isinstance(o, (types.MethodType, types.FunctionType)) and not isinstance(o, property)
-            ):
-
-                if getattr(call, '_pv_is_pure_virtual', None):
-                    attr = getattr(cls, name)
-
-                    # For override decorator
-                    if getattr(attr, '_pv_override', False):
-                        attr = attr.pv_overloaded_function
-
-                    if call.__code__ is attr.__code__:
-                        # Check 1: Have we overloaded all functions?
-                        sig = util.signature(call)
-                        must_overload.add("def {}{}".format(call.__name__, sig))
-                    elif getattr(base, 'pv_explicit_args', True):
-                        # Check 2: Do the arguments line up?
-                        proper = util.getfullargspec(call)._asdict()
-                        attr_sig = util.getfullargspec(attr)._asdict()
-
-                        if not call._pv_strict_types and util.PY3:
-                            proper.pop('annotations')
-                            attr_sig.pop('annotations')
-                        if not call._pv_strict_defaults:
-                            proper.pop('defaults')
-                            attr_sig.pop('defaults')
-
-                        if proper != attr_sig:
-                            wrong_signature.add(_signature(call.__name__, call, attr))
-
-            if (len(must_overload) > 0) or (len(wrong_signature) > 0):
-                error_message = "Virtual Class Declaration:\n"
-
-                if must_overload:
-                    error_message +=  ("- '{}'{}: The following pure virtual functions must be overloaded from base: '{}'" +\
-                                       " before class can be used:\n    - {}{}").format(
-                                          cls.__name__,
-                                          _class_file(),
-                                          base.__name__,
-                                          '\n    - '.join(list(must_overload)),
-                                          '\n' if len(wrong_signature) > 0 else ''
-                                      )
-                if wrong_signature:
-                    error_message += ("- '{}'{}: The following overload functions have the wrong signature " +\
-                                      "from base: '{}'\n    - {}").format(
-                                          cls.__name__,
-                                          _class_file(),
-                                          base.__name__,
-                                          "\n    - ".join(wrong_signature)
-                                      )
-
-                raise PureVirtualError(error_message)
-
-        list(map(_iterate, bases)) # Cast to list for Python 3
+        collectors = pv._collector_stack()
+        if not collectors:
+            raise PureVirtualError(
+                pv._format_violations(cls, base, must_overload, wrong_signature)
+            )
+
+        violations = collectors[-1]
+        for kind, found in ((PureVirtualViolation.MUST_OVERLOAD, must_overload),
+                            (PureVirtualViolation.WRONG_SIGNATURE, wrong_signature)):
+            for name, detail in found.items():
+                violations.append(PureVirtualViolation(cls, base, name, kind, detail))
+
+    @classmethod
+    def _assert_subclass_viable(pv, cls, bases):
+        """
+        Internal function that does the in line subclass verification.
+        This will raise a PureVirtualError if something is amiss. The pure
+        virtual functions of each base are cached on the class as its contract
+        so later checks (see pv_guard_assignment) can look up a single name.
+        :return: None
+        """
+        generic_bases = {}
+        for alias in cls.__dict__.get('__orig_bases__', ()):
+            if getattr(alias, '__origin__', None) is not None:
+                generic_bases[alias.__origin__] = alias
+
+        contract = {}
+        for base in bases:
+            must_overload = {}
+            wrong_signature = {}
+
+            alias = generic_bases.get(base)
+
+            for name, call in pv._pure_virtual_members(base):
+                contract.setdefault(name, []).append((base, call, alias))
+                pv._check_overload(cls, base, name, call, must_overload, wrong_signature, alias)
+
+            pv._report_violations(cls, base, must_overload, wrong_signature)
+
+        type.__setattr__(cls, '_pv_contract', contract)
+
+    @classmethod
+    def _pure_virtual_hints(pv, call):
+        """
+        The annotations of a pure virtual function with strings resolved. These
+        are memoized per function once every name can be resolved.
+        :return: dict
+        """
+        func = getattr(call, '__func__', call)
+        try:
+            return pv._type_hint_cache[func]
+        except KeyError:
+            pass
+
+        hints = util.type_hints(func)
+        if hints is None:
+            # Not cached, the names may still be defined later on
+            return func.__annotations__
+
+        pv._type_hint_cache[func] = hints
+        return hints
+
+    @classmethod
+    def _generic_contract(pv, alias, resolve=False):
+        """
+        The annotations of each pure virtual function on a generic base with the
+        type parameters of alias (e.g. Repository[User]) substituted in. This is
+        cached per parametrization so every implementation of the same alias
+        shares one resolved contract.
+        :param resolve: bool substitute into the annotations with strings resolved
+        :return: dict[str, dict] of function name to annotations
+        """
+        key = (alias, resolve)
+        try:
+            return pv._generic_contracts[key]
+        except KeyError:
+            pass
+        except TypeError: # pragma: no cover
+            # Unhashable parameters, resolve without caching
+            return pv._resolve_generic_contract(alias, resolve)
+
+        contract = pv._generic_contracts[key] = pv._resolve_generic_contract(alias, resolve)
+        return contract
+
+    @classmethod
+    def _resolve_generic_contract(pv, alias, resolve):
+        """
+        Uncached body of _generic_contract()
+        :return: dict[str, dict] of function name to annotations
+        """
+        mapping = util.generic_type_map(alias)
+        contract = {}
+        for name, call in pv._pure_virtual_members(alias.__origin__):
+            if resolve:
+                annotations = pv._pure_virtual_hints(call)
+            else:
+                annotations = getattr(call, '__annotations__', {})
+            contract[name] = dict(
+                (key, util.substitute_type_vars(value, mapping))
+                for key, value in annotations.items()
+            )
+        return contract
+
+    @classmethod
+    def _assert_member_viable(pv, cls, name):
+        """
+        Re-validate a single name against the cached contract of cls and every
+        subclass that inherits it.
+        :return: None
+        """
+        classes = [cls]
+        while classes:
+            this_cls = classes.pop()
+            contract = this_cls.__dict__.get('_pv_contract', {})
+            for base, call, alias in contract.get(name, ()):
+                must_overload = {}
+                wrong_signature = {}
+                pv._check_overload(this_cls, base, name, call, must_overload, wrong_signature, alias)
+                pv._report_violations(this_cls, base, must_overload, wrong_signature)
+
+            classes.extend(
+                sub for sub in type.__subclasses__(this_cls) if name not in sub.__dict__
+            )
+
+    @classmethod
+    def _guard_member(pv, cls, name, previous):
+        """
+        Validate a name that was just assigned or deleted on cls, putting back the
+        previous value (or lack thereof) if that breaks the contract or the check
+        itself fails.
+        :return: None
+        """
+        try:
+            pv._assert_member_viable(cls, name)
+        except Exception:
+            if previous is _MISSING:
+                type.__delattr__(cls, name)
+            else:
+                type.__setattr__(cls, name, previous)
+            raise
 
 
 # -- :EXPORT:
@@ -259,6 +559,7 @@ class override(object):
         pass
 
     def __call__(self, function, *args, **kwargs):
+        from functools import wraps
         self._function = function
 
         @wraps(function)
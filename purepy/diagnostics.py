@@ -0,0 +1,120 @@
+"""
+Validate a whole package of pure virtual classes in a single import.
+
+Example:
+
+    from purepy.diagnostics import validate_package
+
+    report = validate_package('my_package')
+    if not report.ok:
+        print (report)
+"""
+from __future__ import absolute_import
+
+import sys
+import pkgutil
+import importlib
+
+from purepy import PureVirtualMeta
+
+# -- :EXPORT:
+class PureVirtualReport(object):
+    """
+    Everything found while importing a package with validate_package()
+    """
+    def __init__(self, package):
+        self.package = package
+        self.violations = [] # list[PureVirtualViolation]
+        self.errors = {} # dict[str, Exception] of modules that failed to import
+
+    @property
+    def ok(self):
+        """
+        :return: bool True if nothing was found
+        """
+        return not self.violations and not self.errors
+
+    def __str__(self):
+        if self.ok:
+            return "No pure virtual violations in '{}'".format(self.package)
+
+        grouped = {}
+        order = []
+        for violation in self.violations:
+            key = (violation.cls, violation.base)
+            if key not in grouped:
+                order.append(key)
+                grouped[key] = ({}, {})
+            must_overload, wrong_signature = grouped[key]
+            if violation.kind == violation.MUST_OVERLOAD:
+                must_overload[violation.name] = violation.detail
+            else:
+                wrong_signature[violation.name] = violation.detail
+
+        messages = [
+            PureVirtualMeta._format_violations(cls, base, *grouped[(cls, base)])
+            for cls, base in order
+        ]
+        messages.extend(
+            "Import Error:\n- '{}': {}".format(module, error)
+            for module, error in sorted(self.errors.items())
+        )
+        return "\n".join(messages)
+
+
+def _forget_module(name):
+    """
+    Remove a module from sys.modules and from its parent package so the
+    next import executes it again
+    """
+    module = sys.modules.pop(name, None)
+    parent, _, child = name.rpartition('.')
+    parent_module = sys.modules.get(parent)
+    if module is not None and getattr(parent_module, child, None) is module:
+        delattr(parent_module, child)
+
+
+# -- :EXPORT:
+def validate_package(package):
+    """
+    Import package and all of its submodules once, collecting every pure
+    virtual violation rather than stopping at the first. Modules that were
+    already imported are not re-executed and so will not be checked.
+
+    The modules of package imported by this call, and any other module it
+    imported that holds a violation, are removed from sys.modules again
+    afterwards. A later plain import will then raise as usual rather than
+    hand back the broken classes.
+    :param package: str name of the package (or module) to import
+    :return: PureVirtualReport
+    """
+    report = PureVirtualReport(package)
+    before = set(sys.modules)
+
+    def _onerror(name):
+        report.errors[name] = sys.exc_info()[1]
+
+    with PureVirtualMeta.collect_violations() as violations:
+        try:
+            root = importlib.import_module(package)
+        except Exception as e:
+            report.errors[package] = e
+            root = None
+
+        if root is not None and hasattr(root, '__path__'):
+            for _, name, _ in pkgutil.walk_packages(root.__path__, package + '.', _onerror):
+                if name in report.errors:
+                    continue
+                try:
+                    importlib.import_module(name)
+                except Exception as e:
+                    report.errors[name] = e
+
+    report.violations.extend(violations)
+
+    tainted = set(violation.cls.__module__ for violation in violations)
+    for name in sorted(set(sys.modules) - before, reverse=True):
+        if name == package or name.startswith(package + '.') or name in tainted:
+            _forget_module(name)
+
+    return report
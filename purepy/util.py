@@ -4,20 +4,32 @@ Minor internal utilities. Probably don't need these in your project
 from __future__ import print_function
 
 import sys
-import inspect
 import itertools
-import copy
 
 PY3 = sys.version_info[0] >= 3
 
+# inspect is only imported once we actually have a signature to look at,
+# importing purepy should stay cheap
+
+def getfullargspec(func):
+    """
+    inspect.getfullargspec (inspect.getargspec for 2.7)
+    """
+    import inspect
+    if PY3:
+        return inspect.getfullargspec(func)
+    return inspect.getargspec(func) # pragma: no cover
+
 # Compatability for 2.7
 if PY3:
-    getfullargspec = inspect.getfullargspec
-    signature = inspect.signature
+    def signature(func):
+        """
+        inspect.signature
+        """
+        import inspect
+        return inspect.signature(func)
 
 else: # pragma: no cover
-    getfullargspec = inspect.getargspec
-
     def _custom_sig(func):
         spec = getfullargspec(func)
         sig = ""
@@ -118,7 +130,7 @@ def give_signature(original, impl):
     try:
         module_name = frame.f_globals.get('__name__', '?')
 
-        evaldict = copy.copy(frame.f_globals)
+        evaldict = dict(frame.f_globals)
         evaldict.update(frame.f_locals)
     except AttributeError: # pragma: no cover (py2)
         module_name = '?'
@@ -127,10 +139,23 @@ def give_signature(original, impl):
     argspec = getfullargspec(original)
     name = original.__name__
 
+    def _bare_signature(func):
+        """
+        Annotations are copied over below, leave them out of the source so types
+        that cannot be written back out (local classes, TypeVars, ...) still compile
+        """
+        if not PY3: # pragma: no cover
+            return signature(func)
+        sig = signature(func)
+        return sig.replace(
+            parameters=[p.replace(annotation=sig.empty) for p in sig.parameters.values()],
+            return_annotation=sig.empty
+        )
+
     # TODO Possibly support generators and coroutines.
     # Not vital for the current state of purepy
     function_string = "def {}{}:\n    return _impl_({})\n".format(
-        name, signature(original), _impl_call_string(argspec)
+        name, _bare_signature(original), _impl_call_string(argspec)
     )
 
     params = argspec.args
@@ -146,7 +171,8 @@ def give_signature(original, impl):
 
     function = _compile_function(name, params, function_string, evaldict)
     function.__name__ = name
-    function.__qualname__ = name
+    # Pickle looks functions up by their qualified name, keep the original
+    function.__qualname__ = getattr(original, '__qualname__', name)
     function.__doc__ = original.__doc__
     function.__dict__ = original.__dict__
     function.__defaults__ = original.__defaults__
@@ -155,3 +181,189 @@ def give_signature(original, impl):
     function.__module__ = original.__module__
 
     return function
+
+
+def has_string_annotations(annotations):
+    """
+    :return: bool True if any annotation is a string (a forward reference or
+             from __future__ import annotations)
+    """
+    return any(isinstance(a, str) for a in annotations.values())
+
+
+def type_hints(func):
+    """
+    The annotations of func with any strings resolved by typing.get_type_hints
+    :return: dict or None if a name cannot be resolved (yet)
+    """
+    annotations = getattr(func, '__annotations__', None)
+    if not annotations:
+        return {}
+
+    try:
+        import typing
+    except ImportError: # pragma: no cover (py3.4)
+        return None
+    func = getattr(func, '__func__', func)
+
+    # Generated stubs only have a snapshot of their globals, prefer the live module
+    namespaces = []
+    module = sys.modules.get(getattr(func, '__module__', None))
+    if module is not None:
+        namespaces.append(vars(module))
+    namespaces.append(getattr(func, '__globals__', None))
+
+    for namespace in namespaces:
+        try:
+            return typing.get_type_hints(func, globalns=namespace)
+        except Exception:
+            pass
+    return None
+
+
+# Memoized subtype decisions, keyed by (sub, sup) annotation pairs
+_subtype_cache = {}
+
+def _union_args(annotation):
+    """
+    :return: tuple of the members of a Union/Optional annotation or None
+    """
+    import types
+    import typing
+    if getattr(annotation, '__origin__', None) is typing.Union:
+        return annotation.__args__
+    if hasattr(types, 'UnionType') and isinstance(annotation, types.UnionType):
+        return annotation.__args__ # pragma: no cover (py3.10+ X | Y)
+    return None
+
+
+def _is_subtype(sub, sup):
+    """
+    Uncached subtype check for two annotations. Parameterized generics are
+    treated as invariant in their arguments.
+    """
+    import typing
+
+    if sub is None:
+        sub = type(None)
+    if sup is None:
+        sup = type(None)
+
+    if sub == sup or sup is typing.Any or sup is object:
+        return True
+
+    sub_args = _union_args(sub)
+    if sub_args is not None:
+        return all(is_subtype(arg, sup) for arg in sub_args)
+
+    sup_args = _union_args(sup)
+    if sup_args is not None:
+        return any(is_subtype(sub, arg) for arg in sup_args)
+
+    sub_origin = getattr(sub, '__origin__', None)
+    sup_origin = getattr(sup, '__origin__', None)
+    if sub_origin is not None and sup_origin is not None:
+        if getattr(sub, '__args__', None) != getattr(sup, '__args__', None):
+            return False
+        sub, sup = sub_origin, sup_origin
+    elif sub_origin is not None:
+        sub = sub_origin
+
+    if isinstance(sub, type) and isinstance(sup, type):
+        try:
+            return issubclass(sub, sup)
+        except TypeError:
+            # Protocols, TypedDicts, ... don't support class checks. We cannot
+            # prove the relationship so it's reported as a wrong signature.
+            return False
+    return False
+
+
+def is_subtype(sub, sup):
+    """
+    Check if the annotation sub can be used where sup is expected. Handles
+    classes, Optional/Union and Any. Results are memoized across calls.
+    :return: bool
+    """
+    key = (sub, sup)
+    try:
+        return _subtype_cache[key]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable annotation, nothing to cache against
+        return _is_subtype(sub, sup)
+
+    result = _subtype_cache[key] = _is_subtype(sub, sup)
+    return result
+
+
+def annotations_compatible(proper, overload):
+    """
+    Variance aware comparison of two annotation dictionaries. Every annotation
+    must be present on both sides, parameters may widen and the return may narrow.
+    :param proper: dict annotations of the pure virtual function
+    :param overload: dict annotations of the overloading function
+    :return: bool
+    """
+    if set(proper) != set(overload):
+        return False
+
+    for name, annotation in proper.items():
+        if name == 'return':
+            if not is_subtype(overload[name], annotation):
+                return False
+        elif not is_subtype(annotation, overload[name]):
+            return False
+    return True
+
+
+def substitute_type_vars(annotation, mapping):
+    """
+    Replace any TypeVar in annotation (including those nested in generics
+    like Optional[T] or List[T]) with its value from mapping
+    :param annotation: the annotation to substitute
+    :param mapping: dict[TypeVar, type]
+    :return: the substituted annotation
+    """
+    try:
+        if annotation in mapping:
+            return mapping[annotation]
+    except TypeError:
+        # Unhashable annotation, cannot hold a TypeVar we know about
+        return annotation
+
+    union_args = _union_args(annotation)
+    if union_args is not None:
+        # X | Y has no __origin__ to rebuild from, so always rebuild as a Union
+        import typing
+        return typing.Union[tuple(substitute_type_vars(arg, mapping) for arg in union_args)]
+
+    params = getattr(annotation, '__parameters__', None)
+    if params and getattr(annotation, '__origin__', None) is not None:
+        return annotation[tuple(substitute_type_vars(p, mapping) for p in params)]
+    return annotation
+
+
+def generic_type_map(alias):
+    """
+    Resolve the type parameters of a parameterized generic class, following the
+    generic bases of that class as well.
+        class Base(Generic[T]): ...
+        class Repository(Base[S]): ...
+        generic_type_map(Repository[User]) -> {S: User, T: User}
+    :param alias: parameterized generic, e.g. Repository[User]
+    :return: dict[TypeVar, type]
+    """
+    import typing
+
+    origin = alias.__origin__
+    mapping = dict(zip(getattr(origin, '__parameters__', ()), alias.__args__))
+
+    skip = (typing.Generic, getattr(typing, 'Protocol', typing.Generic))
+    for base in getattr(origin, '__orig_bases__', ()):
+        if getattr(base, '__origin__', None) in (None,) + skip:
+            continue
+        for type_var, value in generic_type_map(substitute_type_vars(base, mapping)).items():
+            mapping.setdefault(type_var, value)
+    return mapping
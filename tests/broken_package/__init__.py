@@ -0,0 +1,4 @@
+"""
+A package with pure virtual violations for testing purepy.diagnostics.
+Importing it outside of PureVirtualMeta.collect_violations() will raise.
+"""
@@ -0,0 +1,21 @@
+from tests.broken_package.interface import Interface
+
+class MissingOverload(Interface):
+    def save(self, filepath):
+        pass
+
+
+class WrongSignature(Interface):
+    def save(self):
+        pass
+
+    def load(self, filepath):
+        pass
+
+
+class Okay(Interface):
+    def save(self, filepath):
+        pass
+
+    def load(self, filepath):
+        pass
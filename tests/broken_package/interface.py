@@ -0,0 +1,13 @@
+from purepy import PureVirtualMeta, pure_virtual
+from purepy.util import add_metaclass
+
+@add_metaclass(PureVirtualMeta)
+class Interface(object):
+
+    @pure_virtual
+    def save(self, filepath):
+        raise NotImplementedError()
+
+    @pure_virtual
+    def load(self, filepath):
+        raise NotImplementedError()
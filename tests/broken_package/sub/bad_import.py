@@ -0,0 +1 @@
+import purepy_module_that_does_not_exist
@@ -0,0 +1,4 @@
+from tests.broken_package.interface import Interface
+
+class NothingOverloaded(Interface):
+    pass
@@ -0,0 +1,52 @@
+"""
+Classes using postponed annotations for the py3 tests. Every annotation
+here is a string that must be resolved before it can be compared.
+"""
+from __future__ import annotations
+
+from typing import Generic, Optional, TypeVar
+
+from purepy import PureVirtualMeta, pure_virtual
+
+variant_pure_virtual = PureVirtualMeta.new(type_variance=True)
+
+
+class Interface(metaclass=PureVirtualMeta):
+    @variant_pure_virtual
+    def feed(self, pet: Dog) -> Animal:
+        pass
+
+# Defined after Interface, resolved when it is overloaded
+class Animal(object): pass
+class Dog(Animal): pass
+class Puppy(Dog): pass
+
+
+class Overload(Interface):
+    def feed(self, pet: Animal) -> Puppy:
+        pass
+
+
+def narrow_kennel():
+    """
+    Overload that narrows the parameter, should fail
+    """
+    class Narrow(Interface):
+        def feed(self, pet: Puppy) -> Animal:
+            pass
+    return Narrow
+
+
+T = TypeVar('T')
+
+class Repository(Generic[T], metaclass=PureVirtualMeta):
+    @pure_virtual
+    def get(self, key: int) -> Optional[T]:
+        pass
+
+
+class User(object): pass
+
+class UserRepository(Repository[User]):
+    def get(self, key: int) -> Optional[User]:
+        pass
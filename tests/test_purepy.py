@@ -2,12 +2,15 @@ from __future__ import absolute_import
 
 import os
 import sys
+import threading
+import importlib
 
 # Get to the right path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import unittest
-from purepy import PureVirtualMeta, PureVirtualError, pure_virtual, override
+from purepy import PureVirtualMeta, PureVirtualError, PureVirtualViolation, pure_virtual, override
+from purepy.diagnostics import validate_package
 from purepy.util import add_metaclass, PY3
 
 from tests import common
@@ -123,6 +126,26 @@ class BasicPurePyTestCase(common.PurePyTestCase):
 
         self.assertEqual(len(PureVirtualMeta.virtual_functions_from_id(alt_pv_decorator.id())), 1)
 
+    def test_decorator_ids(self):
+        """
+        Each decorator gets its own registry id
+        """
+        ids = set(PureVirtualMeta.new().id() for _ in range(10))
+        ids.add(pure_virtual.id())
+        self.assertEqual(len(ids), 11)
+
+        # Still unique when made from many threads at once
+        thread_ids = []
+        def _make():
+            for _ in range(100):
+                thread_ids.append(PureVirtualMeta.new().id())
+
+        threads = [threading.Thread(target=_make) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(thread_ids)), len(thread_ids))
 
     def test_instance_loading_okay(self):
         """
@@ -216,6 +239,173 @@ class BasicPurePyTestCase(common.PurePyTestCase):
         self.assertTrue(inst.foo(blarg=True) is True)
         self.assertTrue(inst.bar('some_path') is False)
 
+    def test_guard_assignment(self):
+        """
+        Test that pv_guard_assignment re-validates overloads that are set or
+        deleted after the class has been created
+        """
+        class Guarded(self._class):
+            pv_guard_assignment = True
+
+            def foo(self, okay=None, **kwargs):
+                return "foo"
+
+            def bar(self, path):
+                return "bar"
+
+        class GuardedChild(Guarded):
+            pass
+
+        def bad_bar(self):
+            pass
+
+        err = 'overload functions have the wrong signature'
+        with self.assertRaisesRegex(PureVirtualError, err):
+            Guarded.bar = bad_bar
+
+        # The failed assignment is rolled back
+        self.assertEqual(Guarded().bar('some_path'), "bar")
+
+        with self.assertRaisesRegex(PureVirtualError, 'must be overloaded from base'):
+            del Guarded.foo
+        self.assertEqual(Guarded().foo(), "foo")
+
+        # Values that aren't functions at all
+        for value in (10, None):
+            with self.assertRaisesRegex(PureVirtualError, "bar = {!r}".format(value)):
+                Guarded.bar = value
+            self.assertEqual(Guarded.__dict__['bar'](None, 'some_path'), "bar")
+
+        def good_bar(self, path):
+            return "good"
+
+        Guarded.bar = good_bar
+        Guarded.something_else = 10
+        del Guarded.something_else
+        self.assertEqual(GuardedChild().bar('some_path'), "good")
+
+    def test_guard_assignment_subclass(self):
+        """
+        Test that guarded assignment also checks subclasses that inherit the
+        assigned name
+        """
+        @add_metaclass(PureVirtualMeta)
+        class Mixin(object):
+            pv_guard_assignment = True
+
+            def bar(self, path):
+                return "mixin"
+
+        class Combined(Mixin, self._class):
+            def foo(self, okay=None, **kwargs):
+                pass
+
+        def bad_bar(self):
+            pass
+
+        with self.assertRaisesRegex(PureVirtualError, "'Combined'"):
+            Mixin.bar = bad_bar
+        self.assertEqual(Combined().bar('some_path'), "mixin")
+
+    def test_unguarded_assignment(self):
+        """
+        Without pv_guard_assignment, assignment is left alone
+        """
+        class Unguarded(self._class):
+            def foo(self, okay=None, **kwargs):
+                pass
+
+            def bar(self, path):
+                pass
+
+        def bad_bar(self):
+            pass
+
+        Unguarded.bar = bad_bar
+        del Unguarded.foo
+
+    def test_collect_violations(self):
+        """
+        Test that collect_violations records every problem instead of raising
+        """
+        with PureVirtualMeta.collect_violations() as violations:
+            class NoOverloads(self._class):
+                pass
+
+            class WrongSignature(self._class):
+                def foo(self, okay, **kwargs):
+                    pass
+
+                def bar(self):
+                    pass
+
+        found = sorted((v.cls.__name__, v.name, v.kind) for v in violations)
+        self.assertEqual(found, [
+            ('NoOverloads', 'bar', PureVirtualViolation.MUST_OVERLOAD),
+            ('NoOverloads', 'foo', PureVirtualViolation.MUST_OVERLOAD),
+            ('WrongSignature', 'bar', PureVirtualViolation.WRONG_SIGNATURE),
+            ('WrongSignature', 'foo', PureVirtualViolation.WRONG_SIGNATURE),
+        ])
+        self.assertTrue(all(v.base is self._class for v in violations))
+
+        # Back to raising once we leave the context
+        with self.assertRaises(PureVirtualError):
+            class NoOverloadsAgain(self._class):
+                pass
+
+    def test_collect_violations_thread(self):
+        """
+        Collecting on one thread doesn't change class creation on others
+        """
+        errors = []
+        def _define():
+            try:
+                class OtherThread(self._class):
+                    pass
+            except PureVirtualError as e:
+                errors.append(e)
+
+        with PureVirtualMeta.collect_violations() as violations:
+            thread = threading.Thread(target=_define)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(violations, [])
+
+    def test_validate_package(self):
+        """
+        Test that a package tree can be checked in a single import
+        """
+        report = validate_package('tests.broken_package')
+        self.assertFalse(report.ok)
+
+        found = sorted((v.cls.__name__, v.name, v.kind) for v in report.violations)
+        self.assertEqual(found, [
+            ('MissingOverload', 'load', PureVirtualViolation.MUST_OVERLOAD),
+            ('NothingOverloaded', 'load', PureVirtualViolation.MUST_OVERLOAD),
+            ('NothingOverloaded', 'save', PureVirtualViolation.MUST_OVERLOAD),
+            ('WrongSignature', 'save', PureVirtualViolation.WRONG_SIGNATURE),
+        ])
+        self.assertEqual(list(report.errors), ['tests.broken_package.sub.bad_import'])
+        self.assertIsInstance(report.errors['tests.broken_package.sub.bad_import'], ImportError)
+
+        message = str(report)
+        self.assertIn("'MissingOverload'", message)
+        self.assertIn("def save(self): -> def save(self, filepath):", message)
+        self.assertIn("tests.broken_package.sub.bad_import", message)
+
+        # Nothing broken is left behind for a later import to pick up
+        self.assertFalse([m for m in sys.modules if m.startswith('tests.broken_package')])
+        def _cleanup():
+            for name in [m for m in sys.modules if m.startswith('tests.broken_package')]:
+                del sys.modules[name]
+        self.addCleanup(_cleanup)
+        with self.assertRaises(PureVirtualError):
+            importlib.import_module('tests.broken_package.impl')
+
+        self.assertTrue(validate_package('tests.common').ok)
+
 
 # ----------------------------------------------------------------------------------------------
 # -- Main Function to run tests
@@ -1,9 +1,62 @@
 """
 Python 3+ features testing
 """
+import os
+import sys
+import ast
+import pickle
+import unittest
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Generic, List, Optional, Sequence, TypeVar, Union
+
 from tests import common
 
-from purepy import PureVirtualMeta, PureVirtualError, pure_virtual
+from purepy import PureVirtualMeta, PureVirtualError, pure_virtual, override, util
+
+
+# Module level classes so they can be pickled by reference
+class PickleInterface(metaclass=PureVirtualMeta):
+    pv_allow_base_instance = True
+
+    @pure_virtual
+    def compute(self, value: int) -> int:
+        raise NotImplementedError()
+
+
+class PickleOverload(PickleInterface):
+    def __init__(self, factor=2):
+        self.factor = factor
+
+    def compute(self, value: int) -> int:
+        return value * self.factor
+
+
+class PickleOverride(PickleInterface):
+    @override()
+    def compute(self, value: int) -> int:
+        return value + 1
+
+
+# Import budget for a bare "import purepy". itertools is built into the
+# interpreter and gives us atomic counters. The time is only a loose guard,
+# the module set is what keeps the import light.
+IMPORT_MODULE_BUDGET = {'__future__', 'itertools', 'purepy', 'purepy.util'}
+IMPORT_TIME_BUDGET = 0.25 # seconds
+
+_IMPORT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {path!r})
+before = set(sys.modules)
+start = time.perf_counter()
+import purepy
+elapsed = time.perf_counter() - start
+print(repr((elapsed, sorted(set(sys.modules) - before))))
+"""
+
+def _compute_in_worker(value):
+    return PickleOverload(3).compute(value)
+
 
 class PureVirtualTypeTesting(common.PurePyTestCase):
 
@@ -51,3 +104,402 @@ class PureVirtualTypeTesting(common.PurePyTestCase):
             class ShouldFail(Base):
                 def foo(self, filepath, garb = True):
                     pass
+
+    def test_type_variance(self):
+        """
+        Test that type_variance lets parameters widen and returns narrow
+        """
+        variant_pure_virtual = PureVirtualMeta.new(type_variance=True)
+
+        class Animal(object): pass
+        class Dog(Animal): pass
+        class Puppy(Dog): pass
+
+        class Base(metaclass=PureVirtualMeta):
+            @variant_pure_virtual
+            def foo(self, pet: Dog, name: Optional[str] = None) -> Animal:
+                pass
+
+        class Wider(Base):
+            def foo(self, pet: Animal, name: Union[str, bytes, None] = None) -> Dog:
+                pass
+
+        class AnyParam(Base):
+            def foo(self, pet: Any, name: object = None) -> Dog:
+                pass
+
+        with self.assertRaises(PureVirtualError):
+            # Parameters cannot narrow
+            class NarrowParam(Base):
+                def foo(self, pet: Puppy, name: Optional[str] = None) -> Animal:
+                    pass
+
+        with self.assertRaises(PureVirtualError):
+            # Returns cannot widen
+            class WideReturn(Base):
+                def foo(self, pet: Dog, name: Optional[str] = None) -> object:
+                    pass
+
+        with self.assertRaises(PureVirtualError):
+            # None is not an Animal
+            class OptionalReturn(Base):
+                def foo(self, pet: Dog, name: Optional[str] = None) -> Optional[Dog]:
+                    pass
+
+        with self.assertRaises(PureVirtualError):
+            # Annotations cannot be dropped
+            class NoHint(Base):
+                def foo(self, pet, name: Optional[str] = None) -> Animal:
+                    pass
+
+    @unittest.skipIf(sys.version_info < (3, 7), "Postponed annotations need 3.7+")
+    def test_type_variance_postponed(self):
+        """
+        String annotations (from __future__ import annotations) are resolved
+        before comparing
+        """
+        from tests import postponed
+
+        self.assertEqual(postponed.Interface.feed.__annotations__['return'], 'Animal')
+        with self.assertRaises(PureVirtualError):
+            postponed.narrow_kennel()
+
+        # Resolved once and kept for the next overload
+        self.assertIn(postponed.Interface.feed, PureVirtualMeta._type_hint_cache)
+
+    def test_raw_annotations_not_resolved(self):
+        """
+        Annotations without strings are compared as they are
+        """
+        class Base(metaclass=PureVirtualMeta):
+            @pure_virtual
+            def foo(self, value: int) -> None:
+                pass
+
+        class Overload(Base):
+            def foo(self, value: int) -> None:
+                pass
+
+        self.assertNotIn(Base.foo, PureVirtualMeta._type_hint_cache)
+
+    def test_type_variance_generics(self):
+        """
+        Parameterized generics are invariant in their arguments
+        """
+        variant_pure_virtual = PureVirtualMeta.new(type_variance=True)
+
+        class Base(metaclass=PureVirtualMeta):
+            @variant_pure_virtual
+            def foo(self, items: List[int]) -> List[int]:
+                pass
+
+        class Same(Base):
+            def foo(self, items: List[int]) -> List[int]:
+                pass
+
+        class Wider(Base):
+            def foo(self, items: Sequence[int]) -> List[int]:
+                pass
+
+        class Bare(Base):
+            def foo(self, items: list) -> List[int]:
+                pass
+
+        with self.assertRaises(PureVirtualError):
+            class BareReturn(Base):
+                def foo(self, items: List[int]) -> list:
+                    pass
+
+        with self.assertRaises(PureVirtualError):
+            class Different(Base):
+                def foo(self, items: List[str]) -> List[int]:
+                    pass
+
+    @unittest.skipIf(sys.version_info < (3, 8), "Protocol and TypedDict need 3.8+")
+    def test_type_variance_no_class_checks(self):
+        """
+        Types that refuse issubclass() are reported, not raised from
+        """
+        from typing import Protocol, TypedDict
+
+        variant_pure_virtual = PureVirtualMeta.new(type_variance=True)
+
+        class Closer(Protocol):
+            def close(self) -> None: ...
+
+        class Point(TypedDict):
+            x: int
+
+        class Base(metaclass=PureVirtualMeta):
+            @variant_pure_virtual
+            def foo(self, item: int) -> Point:
+                pass
+
+        with self.assertRaises(PureVirtualError):
+            class ProtocolParam(Base):
+                def foo(self, item: Closer) -> Point:
+                    pass
+
+        with self.assertRaises(PureVirtualError):
+            class DictReturn(Base):
+                def foo(self, item: int) -> dict:
+                    pass
+
+        with PureVirtualMeta.collect_violations() as violations:
+            class Collected(Base):
+                def foo(self, item: Closer) -> dict:
+                    pass
+        self.assertEqual(len(violations), 1)
+
+    def test_subtype_memoized(self):
+        """
+        Subtype decisions are shared across validations
+        """
+        util._subtype_cache.clear()
+        self.assertTrue(util.is_subtype(bool, int))
+        self.assertIn((bool, int), util._subtype_cache)
+        self.assertFalse(util.is_subtype(int, bool))
+        self.assertTrue(util.is_subtype(None, Optional[int]))
+        self.assertFalse(util.is_subtype(Optional[int], int))
+
+        # Unhashable annotations are still compared
+        self.assertTrue(util.is_subtype([int], [int]))
+
+
+@unittest.skipIf(sys.version_info < (3, 7), "Generic has its own metaclass before 3.7")
+class PureVirtualGenericTesting(common.PurePyTestCase):
+
+    def setUp(self):
+        """
+        Build a generic interface to implement against
+        """
+        T = TypeVar('T')
+
+        class User(object): pass
+        class Admin(User): pass
+
+        class Repository(Generic[T], metaclass=PureVirtualMeta):
+            @pure_virtual
+            def get(self, key: int) -> Optional[T]:
+                pass
+
+            @pure_virtual
+            def add(self, items: List[T]) -> None:
+                pass
+
+        self.T = T
+        self.User = User
+        self.Admin = Admin
+        self._class = Repository
+
+    def test_substituted_signature(self):
+        """
+        Overloads are compared against the parameterized annotations
+        """
+        User = self.User
+
+        class UserRepository(self._class[User]):
+            def get(self, key: int) -> Optional[User]:
+                pass
+
+            def add(self, items: List[User]) -> None:
+                pass
+
+        with self.assertRaises(PureVirtualError) as context:
+            class WrongRepository(self._class[User]):
+                def get(self, key: int) -> Optional[int]:
+                    pass
+
+                def add(self, items: List[User]) -> None:
+                    pass
+
+        # The expected layout is shown with T substituted
+        expected = str(context.exception).split(': -> ')[-1]
+        self.assertNotIn('~T', expected)
+        self.assertIn(User.__qualname__, expected)
+
+        with self.assertRaises(PureVirtualError):
+            # Unparameterized, nothing to substitute
+            class RawRepository(self._class):
+                def get(self, key: int) -> Optional[User]:
+                    pass
+
+                def add(self, items: List[User]) -> None:
+                    pass
+
+    def test_shared_contract(self):
+        """
+        Implementations of the same parametrization share one resolved contract
+        """
+        User = self.User
+        alias = self._class[User]
+
+        class FirstRepository(alias):
+            def get(self, key: int) -> Optional[User]:
+                pass
+
+            def add(self, items: List[User]) -> None:
+                pass
+
+        contract = PureVirtualMeta._generic_contracts[(alias, False)]
+        self.assertEqual(contract['get']['return'], Optional[User])
+
+        class SecondRepository(self._class[User]):
+            def get(self, key: int) -> Optional[User]:
+                pass
+
+            def add(self, items: List[User]) -> None:
+                pass
+
+        self.assertIs(PureVirtualMeta._generic_contracts[(self._class[User], False)], contract)
+        self.assertEqual(SecondRepository._pv_contract['get'][0][2], alias)
+
+    def test_nested_generic(self):
+        """
+        Type parameters are followed through generic subclasses
+        """
+        S = TypeVar('S')
+        User = self.User
+
+        class Middle(self._class[S]):
+            pv_allow_base_instance = True
+            pure_virtual = PureVirtualMeta.new()
+
+            def get(self, key: int) -> Optional[S]:
+                pass
+
+            def add(self, items: List[S]) -> None:
+                pass
+
+            @pure_virtual
+            def find(self, name: str) -> List[S]:
+                pass
+
+        class UserMiddle(Middle[User]):
+            def get(self, key: int) -> Optional[User]:
+                pass
+
+            def add(self, items: List[User]) -> None:
+                pass
+
+            def find(self, name: str) -> List[User]:
+                pass
+
+        self.assertEqual(
+            util.generic_type_map(Middle[User]),
+            {S: User, self.T: User}
+        )
+
+    @unittest.skipIf(sys.version_info < (3, 7), "Postponed annotations need 3.7+")
+    def test_postponed_generic(self):
+        """
+        String annotations are resolved before substituting
+        """
+        from tests import postponed
+
+        alias = postponed.Repository[postponed.User]
+        self.assertEqual(
+            PureVirtualMeta._generic_contracts[(alias, True)]['get']['return'],
+            Optional[postponed.User]
+        )
+
+    @unittest.skipIf(sys.version_info < (3, 10), "X | Y unions need 3.10+")
+    def test_union_operator(self):
+        """
+        Type parameters are substituted inside X | Y unions
+        """
+        T, User = self.T, self.User
+
+        class Store(Generic[T], metaclass=PureVirtualMeta):
+            @pure_virtual
+            def get(self, key: int) -> list[T] | None:
+                pass
+
+        class UserStore(Store[User]):
+            def get(self, key: int) -> list[User] | None:
+                pass
+
+        with self.assertRaises(PureVirtualError):
+            class IntStore(Store[User]):
+                def get(self, key: int) -> list[int] | None:
+                    pass
+
+    def test_generic_variance(self):
+        """
+        Substituted annotations work with type_variance
+        """
+        variant_pure_virtual = PureVirtualMeta.new(type_variance=True)
+        T = self.T
+        User, Admin = self.User, self.Admin
+
+        class Store(Generic[T], metaclass=PureVirtualMeta):
+            @variant_pure_virtual
+            def put(self, item: T) -> Optional[T]:
+                pass
+
+        class AdminStore(Store[Admin]):
+            def put(self, item: User) -> Admin:
+                pass
+
+        with self.assertRaises(PureVirtualError):
+            class NarrowStore(Store[User]):
+                def put(self, item: Admin) -> User:
+                    pass
+
+
+class PureVirtualPickleTesting(common.PurePyTestCase):
+
+    def test_pickle_by_reference(self):
+        """
+        Classes, the generated pure virtual stubs and overloads all pickle
+        by reference
+        """
+        for obj in (PickleInterface, PickleOverload, PickleInterface.compute,
+                    PickleOverload.compute, PickleOverride.compute):
+            self.assertIs(pickle.loads(pickle.dumps(obj)), obj)
+
+        self.assertEqual(PickleInterface.compute.__qualname__, 'PickleInterface.compute')
+
+        inst = pickle.loads(pickle.dumps(PickleOverload(4)))
+        self.assertEqual(inst.compute(2), 8)
+
+        method = pickle.loads(pickle.dumps(PickleOverride().compute))
+        self.assertEqual(method(2), 3)
+
+        with self.assertRaises(NotImplementedError):
+            pickle.loads(pickle.dumps(PickleInterface().compute))(1)
+
+    def test_process_pool(self):
+        """
+        Fan work out to a process pool using purepy classes, instances and
+        bound methods
+        """
+        values = list(range(32))
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            self.assertEqual(
+                list(executor.map(_compute_in_worker, values)),
+                [v * 3 for v in values]
+            )
+            self.assertEqual(
+                list(executor.map(PickleOverload(5).compute, values)),
+                [v * 5 for v in values]
+            )
+            with self.assertRaises(NotImplementedError):
+                executor.submit(PickleInterface().compute, 1).result()
+
+
+class PureVirtualImportTesting(common.PurePyTestCase):
+
+    def test_import_budget(self):
+        """
+        Importing purepy only loads purepy itself and stays within a fixed time
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.check_output(
+            [sys.executable, '-S', '-c', _IMPORT_SCRIPT.format(path=root)]
+        )
+        elapsed, modules = ast.literal_eval(output.decode().strip())
+
+        self.assertTrue(set(modules) <= IMPORT_MODULE_BUDGET,
+                        "Unexpected modules: {}".format(set(modules) - IMPORT_MODULE_BUDGET))
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET)